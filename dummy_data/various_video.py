@@ -2,8 +2,11 @@ import os
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 PWD = os.path.dirname(os.path.abspath(__file__))
+ROW_GROUP_SIZE = 8192
 
 
 class VariousVideoDataGenerator:
@@ -39,7 +42,14 @@ class VariousVideoDataGenerator:
         # Create DataFrame and save
         df = pd.DataFrame(rows)
         output_path = os.path.join(self.output_dir, "videos.parquet")
-        df.to_parquet(output_path, index=False)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(
+            table,
+            output_path,
+            compression="snappy",
+            use_dictionary=["video_url", "r2_url", "s3_url", "rel_url"],
+            row_group_size=ROW_GROUP_SIZE,
+        )
 
         print(f"Generated {len(rows)} rows")
         print(f"Saved to {output_path}")
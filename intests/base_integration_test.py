@@ -1,23 +1,95 @@
 """Base integration test class with server management."""
 
+import atexit
 import logging
 import socket
 import threading
-import time
 import unittest
 from pathlib import Path
-from typing import Optional
-
-from my_logging import getLogger
-from playwright.sync_api import BrowserContext, Page, sync_playwright
+from typing import Any, Optional
+
+from playwright.sync_api import (
+    Browser,
+    BrowserContext,
+    Page,
+    Playwright,
+    Response,
+    sync_playwright,
+)
+from werkzeug.serving import BaseWSGIServer, make_server
 
 from smoosense.app import SmooSenseApp
 
+from .my_logging import getLogger
+
 logger = getLogger(__name__)
 
+# Chromium flags for headless runs in containers, where /dev/shm is small and there is no GPU,
+# plus switching off background subsystems the tests never use
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI,BackForwardCache",
+]
+
+# Resource types that only matter for what a page looks like
+MEDIA_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Injected before any page script runs, so elements reach their final state as soon as they
+# are added to the DOM instead of after a CSS transition or animation
+DISABLE_ANIMATIONS_SCRIPT = """
+const style = document.createElement("style");
+style.textContent =
+    "*, *::before, *::after { transition: none !important; animation: none !important; }";
+const appendStyle = () => (document.head || document.documentElement).appendChild(style);
+if (document.documentElement) {
+    appendStyle();
+} else {
+    document.addEventListener("DOMContentLoaded", appendStyle);
+}
+"""
+
+
+_playwright: Optional[Playwright] = None
+_browser: Optional[Browser] = None
+
+
+def get_browser() -> Browser:
+    """Launch Chromium once per test process and return the shared browser."""
+    global _playwright, _browser
+    if _browser is None:
+        logger.info("Launching shared Chromium browser")
+        _playwright = sync_playwright().start()
+        _browser = _playwright.chromium.launch(
+            headless=True, args=CHROMIUM_ARGS, chromium_sandbox=False
+        )
+        atexit.register(_close_browser)
+    return _browser
+
+
+def _close_browser() -> None:
+    """Close the shared browser and stop Playwright when the test process exits."""
+    global _playwright, _browser
+    if _browser is not None:
+        _browser.close()
+        _browser = None
+    if _playwright is not None:
+        _playwright.stop()
+        _playwright = None
+
 
 def find_free_port() -> int:
-    """Find a free port to run the test server on."""
+    """
+    Find a free port for tests that pass an explicit port to ServerFixture.
+
+    Used where the port itself is under test, e.g. the custom server config tests.
+    The port is released before returning, so tests that don't care should let
+    ServerFixture bind port 0 instead.
+    """
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind(("", 0))
         s.listen(1)
@@ -25,71 +97,90 @@ def find_free_port() -> int:
     return port
 
 
+def block_media(page: Page) -> None:
+    """Abort image, media and font requests on the page, which only matter for screenshots."""
+    page.route(
+        "**/*",
+        lambda route: (
+            route.abort()
+            if route.request.resource_type in MEDIA_RESOURCE_TYPES
+            else route.continue_()
+        ),
+    )
+
+
+def disable_animations(context: BrowserContext) -> None:
+    """Switch off CSS transitions and animations on every page of the context."""
+    context.add_init_script(DISABLE_ANIMATIONS_SCRIPT)
+
+
+def with_media(test_method):
+    """Mark a test as needing images, media and fonts, e.g. because it takes screenshots."""
+    test_method.with_media = True
+    return test_method
+
+
+def isolated_context(test_method):
+    """Mark a test as needing its own browser context instead of the class-shared one."""
+    test_method.isolated_context = True
+    return test_method
+
+
 class ServerFixture:
     """Test server wrapper for SmooSenseApp with proper lifecycle management."""
 
     def __init__(self, host: str = "localhost", port: Optional[int] = None):
         self.host = host
-        self.port = port or find_free_port()
+        # Port 0 lets the OS pick a free port atomically when the server binds
+        self.port = port or 0
         self.app_instance: Optional[SmooSenseApp] = None
         self.thread: Optional[threading.Thread] = None
-        self.server_ready = threading.Event()
-        self.shutdown_flag = threading.Event()
+        self.server: Optional[BaseWSGIServer] = None
 
-    def _run_server(self) -> None:
-        """Run the server in a separate thread."""
-        try:
-            logger.info(f"Starting SmooSenseApp server on {self.host}:{self.port}")
+    def _create_app_instance(self) -> SmooSenseApp:
+        """Create the SmooSenseApp instance to serve."""
+        # Minimal configuration
+        return SmooSenseApp()
 
-            # Create SmooSenseApp instance with minimal configuration
-            self.app_instance = SmooSenseApp()
-            flask_app = self.app_instance.create_app()
+    def _create_server(self) -> BaseWSGIServer:
+        """Create the Flask app and bind the server socket."""
+        logger.info(f"Starting SmooSenseApp server on {self.host}:{self.port or 'any port'}")
 
-            # Configure Flask app to be more suitable for testing
-            flask_app.config["TESTING"] = True
-            flask_app.config["DEBUG"] = False
+        self.app_instance = self._create_app_instance()
+        flask_app = self.app_instance.create_app()
 
-            # Suppress Flask HTTP access logs
-            logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        # Configure Flask app to be more suitable for testing
+        flask_app.config["TESTING"] = True
+        flask_app.config["DEBUG"] = False
 
-            logger.info("Flask app configured for testing")
+        # Suppress Flask HTTP access logs
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
 
-            # Signal that server is ready
-            self.server_ready.set()
-
-            # Run the Flask app
-            logger.info(f"Flask app starting on {self.base_url}")
-            flask_app.run(
-                host=self.host, port=self.port, debug=False, use_reloader=False, threaded=True
-            )
-        except Exception as e:
-            logger.error(f"Server failed to start: {e}")
-            self.server_ready.set()  # Set anyway to unblock waiting thread
+        logger.info("Flask app configured for testing")
+        return make_server(self.host, self.port, flask_app, threaded=True)
 
     def start(self) -> None:
-        """Start the server in a background thread."""
+        """Bind the server on the caller's thread, then serve it from a background thread."""
+        # make_server reports a failed bind with sys.exit, so turn that into an error here
+        try:
+            self.server = self._create_server()
+        except (OSError, SystemExit) as e:
+            raise RuntimeError(f"Server failed to bind {self.host}:{self.port}") from e
+        self.port = self.server.server_port
+
+        # The socket is already listening, so connections queue until serve_forever runs
         logger.info("Starting server thread")
-        self.thread = threading.Thread(target=self._run_server, daemon=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         self.thread.start()
-
-        # Wait for server to be ready (with timeout)
-        logger.info("Waiting for server to be ready...")
-        if not self.server_ready.wait(timeout=10):
-            logger.error("Server failed to start within 10 seconds")
-            raise RuntimeError("Server failed to start within 10 seconds")
-
-        # Give the server a moment to fully initialize
-        logger.info("Server ready, waiting 1 second for full initialization")
-        time.sleep(1)
         logger.info(f"Server fully ready at {self.base_url}")
 
     def stop(self) -> None:
         """Stop the server."""
-        self.shutdown_flag.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
         if self.thread and self.thread.is_alive():
-            # Flask's built-in server doesn't have a graceful shutdown,
-            # but the daemon thread will be cleaned up when main thread exits
-            pass
+            self.thread.join(timeout=5)
 
     @property
     def base_url(self) -> str:
@@ -100,6 +191,10 @@ class ServerFixture:
 class BaseIntegrationTest(unittest.TestCase):
     """Base test class for integration tests with server and browser management."""
 
+    # Page loaded once by open_shared_page() and reused by tests that need no isolation
+    shared_page: Optional[Page] = None
+    shared_page_response: Optional[Response] = None
+
     @classmethod
     def setUpClass(cls) -> None:
         """Set up server and browser for all tests in the class."""
@@ -107,9 +202,11 @@ class BaseIntegrationTest(unittest.TestCase):
         cls.server = ServerFixture()
         cls.server.start()
 
-        # Start Playwright
-        cls.playwright = sync_playwright().start()
-        cls.browser = cls.playwright.chromium.launch(headless=True)
+        # Reuse the browser shared by all test classes
+        cls.browser = get_browser()
+
+        # Creating a context is expensive, so tests share one and only get a fresh page
+        cls.context: BrowserContext = cls.new_context()
 
         # Ensure screenshots directory exists
         cls.screenshots_dir = Path("intests/screenshots")
@@ -117,31 +214,89 @@ class BaseIntegrationTest(unittest.TestCase):
 
     @classmethod
     def tearDownClass(cls) -> None:
-        """Clean up server and browser after all tests."""
-        cls.browser.close()
-        cls.playwright.stop()
+        """Clean up server and browser context after all tests."""
+        cls.context.close()
         cls.server.stop()
 
+    @classmethod
+    def open_shared_page(cls, url: str) -> None:
+        """Navigate once to url on a page that the class's non-isolated tests reuse."""
+        cls.shared_page = cls.context.new_page()
+        block_media(cls.shared_page)
+        cls.shared_page_response = cls.shared_page.goto(url, wait_until="domcontentloaded")
+
+    @classmethod
+    def new_context(cls) -> BrowserContext:
+        """Create a browser context with the viewport and settings used by all integration tests."""
+        context = cls.browser.new_context(
+            viewport={"width": 1280, "height": 720}, device_scale_factor=2
+        )
+        disable_animations(context)
+        return context
+
     def setUp(self) -> None:
-        """Set up a new browser context and page for each test."""
+        """
+        Set up the page for each test.
+
+        Tests reuse the class's shared page when there is one, so it is not reloaded.
+        Otherwise they get a new page, in their own context if the test is isolated.
+        """
         test_name = self._testMethodName
 
-        self.context: BrowserContext = self.browser.new_context(
-            viewport={"width": 1280, "height": 720}, device_scale_factor=2
+        test_method = getattr(self, test_name)
+        self.isolated = getattr(test_method, "isolated_context", False)
+        with_media_requests = getattr(test_method, "with_media", False)
+        self.reuses_shared_page = (
+            self.shared_page is not None and not self.isolated and not with_media_requests
         )
-        self.page: Page = self.context.new_page()
-        logger.info(f"Browser context and page ready for test: {test_name}")
+        if self.reuses_shared_page:
+            self.page: Page = self.shared_page
+            logger.info(f"Reusing shared browser page for test: {test_name}")
+            return
+
+        if self.isolated:
+            self.context = self.new_context()
+        self.page = self.context.new_page()
+        if not with_media_requests:
+            block_media(self.page)
+        logger.info(f"Browser page ready for test: {test_name}")
 
     def tearDown(self) -> None:
-        """Clean up browser context after each test."""
+        """Close the page and reset the shared context after each test."""
         test_name = self._testMethodName
-        self.context.close()
+        if self.reuses_shared_page:
+            logger.info(f"Test teardown complete: {test_name}")
+            return
+        self.page.close()
+        if self.isolated:
+            self.context.close()
+            # Fall back to the class-shared context for the next test
+            del self.context
+        else:
+            self.context.clear_cookies()
+            self.context.clear_permissions()
         logger.info(f"Test teardown complete: {test_name}")
 
-    def take_screenshot(self, filename: str) -> Path:
-        """Take a screenshot and save it with the given filename."""
+    def take_screenshot(
+        self, filename: str, hi_fidelity: bool = False, **screenshot_options: Any
+    ) -> Path:
+        """
+        Take a screenshot of the viewport and save it with the given filename.
+
+        Screenshots are for visual inspection, so they are encoded as JPEG (the
+        extension is rewritten to .jpg) unless hi_fidelity asks for lossless PNG.
+        Extra keyword arguments, e.g. quality or full_page, override the options
+        passed to Page.screenshot.
+        """
         screenshot_path = self.screenshots_dir / filename
-        self.page.screenshot(path=str(screenshot_path))
+        options = {"full_page": False, "animations": "disabled", "caret": "hide"}
+        if hi_fidelity:
+            options["type"] = "png"
+        else:
+            screenshot_path = screenshot_path.with_suffix(".jpg")
+            options.update(type="jpeg", quality=70)
+        options.update(screenshot_options)
+        self.page.screenshot(path=str(screenshot_path), **options)
         logger.info(f"Screenshot saved: {screenshot_path}")
         return screenshot_path
 
@@ -1,102 +1,74 @@
 """Integration tests for server with custom port and URL prefix."""
 
-import socket
-import sys
-import threading
-import time
+import atexit
 import unittest
 from pathlib import Path
 from typing import Optional
 
-# Add the intests directory to sys.path for imports
-sys.path.insert(0, str(Path(__file__).parent))
-
-from my_logging import getLogger
-from playwright.sync_api import BrowserContext, Page, sync_playwright
+import requests
+from playwright.sync_api import BrowserContext, Page, expect
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from smoosense.app import SmooSenseApp
 
-logger = getLogger(__name__)
-
+from .base_integration_test import (
+    ServerFixture,
+    block_media,
+    disable_animations,
+    find_free_port,
+    get_browser,
+)
+from .my_logging import getLogger
+from .utils import LocatorUtils
 
-def find_free_port() -> int:
-    """Find a free port to run the test server on."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("", 0))
-        s.listen(1)
-        port = s.getsockname()[1]
-    return port
+logger = getLogger(__name__)
 
 
-class CustomServerFixture:
+class CustomServerFixture(ServerFixture):
     """Test server wrapper for SmooSenseApp with custom port and URL prefix."""
 
     def __init__(self, host: str = "localhost", port: Optional[int] = None, url_prefix: str = ""):
-        self.host = host
-        self.port = port or find_free_port()
+        super().__init__(host=host, port=port)
+        # Kept apart from self.port, which start() replaces with the bound port
+        self.requested_port = port
         self.url_prefix = url_prefix
-        self.app_instance: Optional[SmooSenseApp] = None
-        self.thread: Optional[threading.Thread] = None
-        self.server_ready = threading.Event()
-        self.shutdown_flag = threading.Event()
 
     @property
     def base_url(self) -> str:
         """Get base URL for the server."""
         return f"http://{self.host}:{self.port}{self.url_prefix}"
 
-    def _run_server(self) -> None:
-        """Run the server in a separate thread."""
-        try:
-            logger.info(
-                f"Starting SmooSenseApp server on {self.host}:{self.port} with URL prefix '{self.url_prefix}'"
-            )
+    def _create_app_instance(self) -> SmooSenseApp:
+        """Create SmooSenseApp instance with custom URL prefix."""
+        logger.info(f"Using URL prefix '{self.url_prefix}'")
+        return SmooSenseApp(url_prefix=self.url_prefix)
 
-            # Create SmooSenseApp instance with custom URL prefix
-            self.app_instance = SmooSenseApp(url_prefix=self.url_prefix)
-            flask_app = self.app_instance.create_app()
 
-            # Configure Flask app to be more suitable for testing
-            flask_app.config["TESTING"] = True
-            flask_app.config["DEBUG"] = False
+# Custom URL prefix under test
+CUSTOM_URL_PREFIX = "/smoosense"
 
-            # Signal that server is ready
-            self.server_ready.set()
+_servers: dict[tuple[str, str], CustomServerFixture] = {}
 
-            # Run the server
-            flask_app.run(
-                host=self.host,
-                port=self.port,
-                debug=False,
-                threaded=True,
-                use_reloader=False,
-            )
-
-        except Exception as e:
-            logger.error(f"Server failed to start: {e}")
-            self.server_ready.set()  # Set event even on failure to prevent hanging
-            raise
-
-    def start(self) -> None:
-        """Start the server in a background thread."""
-        logger.info(f"Starting server fixture on {self.host}:{self.port}")
-        self.thread = threading.Thread(target=self._run_server, daemon=True)
-        self.thread.start()
 
-        # Wait for server to be ready with timeout
-        if not self.server_ready.wait(timeout=30):
-            raise RuntimeError("Server failed to start within 30 seconds")
+def get_or_start_server(url_prefix: str, host: str = "localhost") -> CustomServerFixture:
+    """Start one server per (host, url_prefix) per test process and return the shared one."""
+    key = (host, url_prefix)
+    if key not in _servers:
+        if not _servers:
+            atexit.register(_stop_servers)
+        # Pick the explicit port right before binding it to keep the race with other
+        # xdist workers as short as possible
+        server = CustomServerFixture(host=host, port=find_free_port(), url_prefix=url_prefix)
+        server.start()
+        _servers[key] = server
+    return _servers[key]
 
-        # Additional wait to ensure server is fully ready
-        time.sleep(2)
-        logger.info(f"Server started successfully at {self.base_url}")
 
-    def stop(self) -> None:
-        """Stop the server."""
-        if self.app_instance:
-            logger.info("Stopping server fixture")
-            self.shutdown_flag.set()
-            # In a real implementation, we might need additional cleanup
+def _stop_servers() -> None:
+    """Stop the shared custom servers when the test process exits."""
+    while _servers:
+        _, server = _servers.popitem()
+        server.stop()
 
 
 class TestCustomServerConfig(unittest.TestCase):
@@ -107,11 +79,10 @@ class TestCustomServerConfig(unittest.TestCase):
         """Set up server, browser and custom configuration."""
         logger.info("Setting up TestCustomServerConfig")
 
-        # Set up custom server with URL prefix
-        cls.custom_port = find_free_port()
-        cls.url_prefix = "/smoosense"
-        cls.server = CustomServerFixture(port=cls.custom_port, url_prefix=cls.url_prefix)
-        cls.server.start()
+        # Reuse the server on an explicit custom port with the custom URL prefix
+        cls.url_prefix = CUSTOM_URL_PREFIX
+        cls.server = get_or_start_server(cls.url_prefix)
+        cls.custom_port = cls.server.port
 
         # Get the root folder (parent of parent directory of this file)
         cls.root_folder = Path(__file__).parent.parent.parent
@@ -120,11 +91,17 @@ class TestCustomServerConfig(unittest.TestCase):
         cls.folder_browser_url = f"{cls.server.base_url}/FolderBrowser?rootFolder={cls.root_folder}"
         logger.info(f"FolderBrowser URL configured: {cls.folder_browser_url}")
 
-        # Set up Playwright browser
-        cls.playwright = sync_playwright().start()
-        cls.browser = cls.playwright.chromium.launch(headless=True)
+        # Set up a context on the browser shared by all test classes
+        cls.browser = get_browser()
         cls.context: BrowserContext = cls.browser.new_context()
+        disable_animations(cls.context)
         cls.page: Page = cls.context.new_page()
+        block_media(cls.page)
+
+        # Build the locators used across the tests once for the class page
+        cls.body = cls.page.locator("body")
+        cls.data_node = LocatorUtils.tree_node(cls.page, "data")
+        cls.open_table_button = cls.page.locator('button[title="Open in Table view"]')
 
         # Set longer timeouts for integration tests
         cls.page.set_default_timeout(30000)  # 30 seconds
@@ -140,12 +117,6 @@ class TestCustomServerConfig(unittest.TestCase):
             cls.page.close()
         if hasattr(cls, "context"):
             cls.context.close()
-        if hasattr(cls, "browser"):
-            cls.browser.close()
-        if hasattr(cls, "playwright"):
-            cls.playwright.stop()
-        if hasattr(cls, "server"):
-            cls.server.stop()
 
         logger.info("TestCustomServerConfig teardown completed")
 
@@ -157,77 +128,86 @@ class TestCustomServerConfig(unittest.TestCase):
 
         # Navigate to the FolderBrowser
         logger.info(f"Navigating to: {self.folder_browser_url}")
-        response = self.page.goto(self.folder_browser_url)
+        response = self.page.goto(self.folder_browser_url, wait_until="domcontentloaded")
 
         # Check that the response was successful
         self.assertIsNotNone(response)
         self.assertEqual(response.status, 200)
 
-        # Wait for the page to load completely
-        self.page.wait_for_load_state("networkidle")
+        # Wait for the folder tree to render
+        self.data_node.wait_for(timeout=10000)
 
         # Check that the page has loaded some content
-        body_content = self.page.locator("body").text_content()
+        body_content = self.body.text_content()
         self.assertIsNotNone(body_content)
 
         # Check if the folder browser page loaded correctly
         logger.info("Verifying folder browser page loaded correctly")
 
         # Find the data folder node
-        data_node = self.page.locator('span[title="data"]')
-        self.assertEqual(data_node.count(), 1, "Data folder not found in navigation")
+        expect(self.data_node, "Data folder not found in navigation").to_have_count(1)
         logger.info("Found 'data' folder node")
 
         # Click on the data folder to expand it
         logger.info("Clicking to expand 'data' folder")
-        data_node.click()
-
-        # Wait a moment for expansion to complete
-        time.sleep(2)
+        self.data_node.click()
 
         # Check if parquet file is there after expansion
         # Focus specifically on dummy_data_various_types.parquet for consistent testing
         test_file = "dummy_data_various_types.parquet"
-        file_node = self.page.locator(f'span[title="{test_file}"]')
-        self.assertEqual(file_node.count(), 1, f"{test_file} not found after expansion")
+        file_node = LocatorUtils.tree_node(self.page, test_file)
+        expect(file_node, f"{test_file} not found after expansion").to_have_count(1)
         logger.info(f"Found target parquet file: {test_file}")
 
         # Click on the parquet file to test preview
         logger.info(f"Clicking on parquet file: {test_file}")
         file_node.click()
 
-        # Wait for preview to load
-        time.sleep(3)
-        self.page.wait_for_load_state("networkidle")
+        # Wait for preview to load; the checks below handle a preview without known elements
+        try:
+            LocatorUtils.wait_for_preview(self.page)
+        except PlaywrightTimeoutError:
+            logger.warning("No known preview element appeared after selecting the file")
 
         # Check if preview is displayed correctly with specific elements
         logger.info("Checking for specific preview elements...")
 
-        # Check for AG-Grid table headers (column_name should be present in dummy_data_various_types.parquet)
-        column_name_header = self.page.locator(
-            'span.ag-header-cell-text[data-ref="eText"]:has-text("column_name")'
+        # Count all the preview elements in one round trip rather than one per locator
+        counts = LocatorUtils.count_elements(
+            self.page,
+            {
+                # column_name should be present in dummy_data_various_types.parquet
+                "column_name_header": (
+                    'span.ag-header-cell-text[data-ref="eText"]',
+                    "column_name",
+                ),
+                "column_name_cells": ('[col-id="column_name"]', "idx_str"),
+                "preview_content": (
+                    '[data-testid="file-preview"], .preview-content, table, .file-preview',
+                    None,
+                ),
+                "open_table_button": ('button[title="Open in Table view"]', None),
+            },
         )
-        if column_name_header.count() > 0:
+
+        # Check for AG-Grid table headers
+        if counts["column_name_header"] > 0:
             logger.info("Found AG-Grid column header for 'column_name'")
 
             # Check for cells with col-id=column_name containing idx_str
-            column_name_cells = self.page.locator('[col-id="column_name"]:has-text("idx_str")')
-            if column_name_cells.count() > 0:
+            if counts["column_name_cells"] > 0:
                 logger.info(
-                    f"Found {column_name_cells.count()} cells with col-id='column_name' containing 'idx_str'"
+                    f"Found {counts['column_name_cells']} cells with col-id='column_name' containing 'idx_str'"
                 )
             else:
                 logger.warning("No cells with col-id='column_name' containing 'idx_str' found")
         else:
             # Fallback to general preview checking
             logger.info("AG-Grid column header not found, checking for general preview content...")
-            preview_content = self.page.locator(
-                '[data-testid="file-preview"], .preview-content, table, .file-preview'
-            )
 
-            if preview_content.count() == 0:
+            if counts["preview_content"] == 0:
                 # Check if page content changed significantly
-                updated_content = self.page.locator("body").text_content()
+                updated_content = self.body.text_content()
                 self.assertIsNotNone(updated_content)
                 self.assertNotEqual(
                     body_content, updated_content, "Page content didn't change after file selection"
@@ -236,34 +216,28 @@ class TestCustomServerConfig(unittest.TestCase):
                     "File preview appears to be working (content changed after file selection)"
                 )
             else:
-                logger.info(f"Found {preview_content.count()} preview elements")
+                logger.info(f"Found {counts['preview_content']} preview elements")
 
         logger.info("File preview test completed successfully")
 
         # Test "Open in Table view" button functionality
         logger.info("Testing 'Open in Table view' button functionality...")
-        open_table_button = self.page.locator('button[title="Open in Table view"]')
-
-        if open_table_button.count() > 0:
+        if counts["open_table_button"] > 0:
             logger.info("Found 'Open in Table view' button")
 
-            # Get the current page count before clicking
-            initial_page_count = len(self.context.pages)
-
-            # Click the button (this should open a new tab/page)
-            open_table_button.click()
-
-            # Wait a moment for the new page to open
-            time.sleep(2)
+            # Click the button (this should open a new tab/page) and take the page once it opens
+            new_page: Optional[Page] = None
+            try:
+                with self.context.expect_page(timeout=5000) as new_page_info:
+                    self.open_table_button.click()
+                new_page = new_page_info.value
+            except PlaywrightTimeoutError:
+                pass
 
             # Check if a new page was opened
-            current_page_count = len(self.context.pages)
-            if current_page_count > initial_page_count:
+            if new_page is not None:
                 logger.info("New page/tab opened after clicking 'Open in Table view'")
-
-                # Get the new page
-                new_page = self.context.pages[-1]
-                new_page.wait_for_load_state("networkidle")
+                new_page.wait_for_load_state("domcontentloaded")
 
                 # Check if the new page URL contains '/Table'
                 new_url = new_page.url
@@ -276,11 +250,11 @@ class TestCustomServerConfig(unittest.TestCase):
                 logger.info(f"Table view opened with correct URL: {new_url}")
 
                 # Check if AG-Grid table is rendered in the new page
-                aggrid_table = new_page.locator('.ag-root, .ag-theme-alpine, [class*="ag-"]')
-                if aggrid_table.count() > 0:
-                    logger.info(
-                        f"Found AG-Grid table in Table view ({aggrid_table.count()} elements)"
-                    )
+                aggrid_count = new_page.locator(
+                    '.ag-root, .ag-theme-alpine, [class*="ag-"]'
+                ).count()
+                if aggrid_count > 0:
+                    logger.info(f"Found AG-Grid table in Table view ({aggrid_count} elements)")
                 else:
                     logger.warning("AG-Grid table not found in Table view")
 
@@ -302,24 +276,35 @@ class TestCustomServerConfig(unittest.TestCase):
 
         logger.info("All custom server configuration tests completed successfully")
 
+
+class TestCustomServerHttp(unittest.TestCase):
+    """HTTP-only checks for the custom server, which need no browser."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Get the shared custom server."""
+        cls.url_prefix = CUSTOM_URL_PREFIX
+        cls.server = get_or_start_server(cls.url_prefix)
+        cls.custom_port = cls.server.port
+
     def test_different_port_and_prefix_combinations(self) -> None:
         """Test that different port and URL prefix combinations work."""
         logger.info("Testing that the server works with custom port and URL prefix")
 
-        # Verify the server is running on the expected port
-        self.assertEqual(self.server.port, self.custom_port)
+        # Verify the server bound the explicit port rather than an OS-assigned one
+        self.assertEqual(self.server.port, self.server.requested_port)
         self.assertEqual(self.server.url_prefix, self.url_prefix)
 
         # Verify the base URL is constructed correctly
         expected_base_url = f"http://localhost:{self.custom_port}{self.url_prefix}"
         self.assertEqual(self.server.base_url, expected_base_url)
 
-        # Navigate to the root of the server to ensure it responds
+        # Request the root of the server to ensure it responds
         root_url = self.server.base_url + "/"
         logger.info(f"Testing root URL: {root_url}")
 
-        response = self.page.goto(root_url)
-        self.assertEqual(response.status, 200)
+        response = requests.get(root_url, timeout=5)
+        self.assertEqual(response.status_code, 200)
 
         logger.info("Server responds correctly with custom port and URL prefix")
 
@@ -1,15 +1,12 @@
 """FolderBrowser integration tests."""
 
-import sys
-import time
 from pathlib import Path
 
-# Add the intests directory to sys.path for imports
-sys.path.insert(0, str(Path(__file__).parent))
+from playwright.sync_api import expect
 
-from base_integration_test import BaseIntegrationTest
-from my_logging import getLogger
-from utils import LocatorUtils
+from .base_integration_test import BaseIntegrationTest, isolated_context, with_media
+from .my_logging import getLogger
+from .utils import LocatorUtils
 
 logger = getLogger(__name__)
 
@@ -27,18 +24,36 @@ class TestFolderBrowser(BaseIntegrationTest):
         cls.folder_browser_url = f"{cls.server.base_url}/FolderBrowser?rootFolder={cls.root_folder}"
         logger.info(f"FolderBrowser URL configured: {cls.folder_browser_url}")
 
+        # Load the FolderBrowser once; tests reset the folder tree instead of reloading
+        cls.open_shared_page(cls.folder_browser_url)
+
+        # Build the locators for the shared page once and reuse them across tests
+        cls.smoosense_gui_node = LocatorUtils.tree_node(cls.shared_page, "smoosense-gui")
+        cls.smoosense_py_node = LocatorUtils.tree_node(cls.shared_page, "smoosense-py")
+        cls.data_node = LocatorUtils.tree_node(cls.shared_page, "data")
+        cls.video_file_node = LocatorUtils.tree_node(
+            cls.shared_page, "compare-video-generation.parquet"
+        )
+
+    def setUp(self) -> None:
+        """Collapse the data folder if a previous test left it expanded."""
+        super().setUp()
+        if self.reuses_shared_page and self.video_file_node.count() > 0:
+            self.data_node.click()
+            self.video_file_node.wait_for(state="detached", timeout=5000)
+
     def test_folder_browser_loads_successfully(self) -> None:
         """Test that the FolderBrowser loads successfully with a rootFolder parameter."""
 
-        # Navigate to the FolderBrowser
-        response = self.page.goto(self.folder_browser_url)
+        # The FolderBrowser was navigated to once for the class
+        response = self.shared_page_response
 
         # Check that the response was successful
         self.assertIsNotNone(response)
         self.assertEqual(response.status, 200)
 
-        # Wait for the page to load completely
-        self.page.wait_for_load_state("networkidle")
+        # Wait for the folder tree to render
+        self.smoosense_gui_node.wait_for(timeout=10000)
 
         # Check that the page has loaded some content (not just a blank page)
         body_content = self.page.locator("body").text_content()
@@ -51,83 +66,71 @@ class TestFolderBrowser(BaseIntegrationTest):
         logger.info(f"Page title: '{title}'")
 
         # Assert that smoosense-gui and smoosense-py folders exist in the navigation
-        smoosense_gui_node = self.page.locator('span[title="smoosense-gui"]')
-        self.assertEqual(
-            smoosense_gui_node.count(), 1, "smoosense-gui folder not found in navigation"
-        )
-
-        smoosense_py_node = self.page.locator('span[title="smoosense-py"]')
-        self.assertEqual(
-            smoosense_py_node.count(), 1, "smoosense-py folder not found in navigation"
+        expect(
+            self.smoosense_gui_node, "smoosense-gui folder not found in navigation"
+        ).to_have_count(1)
+        expect(self.smoosense_py_node, "smoosense-py folder not found in navigation").to_have_count(
+            1
         )
 
         logger.info("Found smoosense-gui and smoosense-py folders in navigation")
         logger.info("FolderBrowser load test completed successfully")
 
+    @isolated_context
+    @with_media
     def test_take_screenshots(self) -> None:
         """Take screenshots of the FolderBrowser in both light and dark modes."""
 
         # Navigate to the FolderBrowser
         logger.info(f"Navigating to FolderBrowser: {self.folder_browser_url}")
-        response = self.page.goto(self.folder_browser_url)
+        response = self.page.goto(self.folder_browser_url, wait_until="domcontentloaded")
         self.assertEqual(response.status, 200)
 
-        # Wait for the page to load completely
-        self.page.wait_for_load_state("networkidle")
-
-        # Click on data folder to expand it
+        # Click on data folder to expand it once the folder tree has rendered
         logger.info("Expanding data folder")
-        data_node = self.page.locator('span[title="data"]')
+        data_node = LocatorUtils.tree_node(self.page, "data")
+        data_node.wait_for(timeout=10000)
         data_node.click()
-        time.sleep(1)  # Wait for expansion
+        LocatorUtils.tree_node(self.page, "compare-video-generation.parquet").wait_for(timeout=5000)
 
         # Take screenshots for each theme mode
         for mode in ["light", "dark"]:
             logger.info(f"Setting theme to {mode} mode")
             LocatorUtils.set_theme_mode(self.page, mode)
 
-            # Click on parquet file
+            # Click on each file and wait for its own preview, not the previous file's
             for file_type, file_name in {
                 "parquet": "compare-video-generation.parquet",
                 "csv": "dummy_data_various_types.csv",
             }.items():
-                self.page.locator(f'span[title="{file_name}"]').click()
+                LocatorUtils.select_file(self.page, file_name)
 
-                self.page.wait_for_load_state("networkidle")
-                time.sleep(2)  # Additional wait for UI updates
-
-                self.take_screenshot(f"folder_browser_{file_type}_{mode}.png")
+                self.take_screenshot(f"folder_browser_{file_type}_{mode}.jpg", quality=80)
 
         logger.info("Screenshot test completed successfully for FolderBrowser")
 
     def test_data_folder_expansion(self) -> None:
         """Test that the data folder can be expanded and shows expected parquet files."""
 
-        # Navigate to the FolderBrowser
-        logger.info(f"Navigating to FolderBrowser: {self.folder_browser_url}")
-        response = self.page.goto(self.folder_browser_url)
+        # The FolderBrowser was navigated to once for the class
+        response = self.shared_page_response
+        self.assertIsNotNone(response)
         self.assertEqual(response.status, 200)
 
-        # Wait for the page to load completely
-        self.page.wait_for_load_state("networkidle")
-
-        # Wait for the data folder node to appear (up to 5 seconds)
-        data_node = self.page.locator('span[title="data"]')
-        data_node.wait_for(timeout=5000)  # Wait up to 5 seconds
-        self.assertEqual(data_node.count(), 1, "Data folder not found in navigation")
+        # Wait for the data folder node to appear
+        expect(self.data_node, "Data folder not found in navigation").to_have_count(
+            1, timeout=10000
+        )
 
         # Click on the data folder to expand it
-        data_node.click()
+        self.data_node.click()
         logger.info("Clicked on data folder")
 
-        # Wait a moment for expansion to complete
-        time.sleep(1)
-
         # Assert that the data folder is expanded and shows expected parquet files
         expected_files = ["compare-video-generation.parquet", "dummy_data_various_types.parquet"]
         for filename in expected_files:
-            file_node = self.page.locator(f'span[title="{filename}"]')
-            self.assertEqual(file_node.count(), 1, f"{filename} not found after expansion")
+            file_node = LocatorUtils.tree_node(self.page, filename)
+            expect(file_node, f"{filename} not found after expansion").to_have_count(1)
 
         logger.info("Found expected parquet files in expanded data folder")
         logger.info("Data folder expansion test completed successfully")
@@ -1,12 +1,41 @@
 """Utility functions and classes for integration tests."""
 
-import time
+from typing import Optional
+from urllib.parse import unquote
 
-from my_logging import getLogger
-from playwright.sync_api import Page
+from playwright.sync_api import Locator, Page, Response
+
+from .my_logging import getLogger
 
 logger = getLogger(__name__)
 
+# Elements that show up once a selected file's preview has rendered
+PREVIEW_SELECTOR = '.ag-root, [data-testid="file-preview"], .preview-content, .file-preview'
+
+# Resolves when the document carries the theme class, with "system" following the OS preference.
+# The GUI's theme provider sets "light" or "dark" as a class on <html>.
+_THEME_APPLIED_JS = """
+(mode) => {
+    const resolved = mode === "system"
+        ? (window.matchMedia("(prefers-color-scheme: dark)").matches ? "dark" : "light")
+        : mode;
+    return document.documentElement.classList.contains(resolved);
+}
+"""
+
+# Counts the elements matching each CSS selector, optionally keeping only those containing a text
+_COUNT_ELEMENTS_JS = """
+(queries) => Object.fromEntries(
+    Object.entries(queries).map(([name, [selector, text]]) => {
+        const elements = Array.from(document.querySelectorAll(selector));
+        const matching = text === null
+            ? elements
+            : elements.filter((element) => (element.textContent || "").includes(text));
+        return [name, matching.length];
+    })
+)
+"""
+
 
 class LocatorUtils:
     """Utility class for common page interactions in integration tests."""
@@ -22,9 +51,9 @@ class LocatorUtils:
         """
         logger.info(f"Setting theme mode to: {mode}")
 
-        # Wait for page to be ready and find the settings button
-        page.wait_for_load_state("networkidle")
+        # Wait for the settings button to render, then open the popover
         settings_button = page.locator('[data-slot="popover-trigger"][title="Settings"]')
+        settings_button.wait_for(timeout=10000)
         settings_button.click()
 
         # Wait for the popover to appear
@@ -38,8 +67,74 @@ class LocatorUtils:
 
         theme_button.click()
 
-        # Close the popover by clicking elsewhere
+        # Wait for the theme to be applied to the document
+        page.wait_for_function(_THEME_APPLIED_JS, arg=mode, timeout=5000)
+
+        # Close the popover by clicking elsewhere and wait for it to go away
         page.click("body")
-        # Wait a moment for theme to apply
-        time.sleep(0.5)
+        popover.wait_for(state="hidden", timeout=5000)
         logger.info(f"Theme mode set to: {mode}")
+
+    @staticmethod
+    def tree_node(page: Page, name: str) -> Locator:
+        """
+        Locate the folder tree node for a file or folder.
+
+        Args:
+            page: Playwright page instance
+            name: File or folder name shown in the tree
+
+        Returns:
+            Locator for the node
+        """
+        return page.locator(f'span[title="{name}"]')
+
+    @staticmethod
+    def count_elements(page: Page, queries: dict[str, tuple[str, Optional[str]]]) -> dict[str, int]:
+        """
+        Count the elements matching several selectors in a single round trip to the browser.
+
+        Args:
+            page: Playwright page instance
+            queries: Mapping from a name to a (CSS selector, required text or None) pair
+
+        Returns:
+            Mapping from each name to the number of matching elements
+        """
+        return page.evaluate(
+            _COUNT_ELEMENTS_JS, {name: list(query) for name, query in queries.items()}
+        )
+
+    @staticmethod
+    def wait_for_preview(page: Page, timeout: float = 10000) -> None:
+        """
+        Wait for the preview of the selected file to render.
+
+        Args:
+            page: Playwright page instance
+            timeout: Maximum time to wait in milliseconds
+        """
+        page.locator(PREVIEW_SELECTOR).first.wait_for(state="visible", timeout=timeout)
+
+    @staticmethod
+    def select_file(page: Page, file_name: str, timeout: float = 10000) -> None:
+        """
+        Click a file in the folder tree and wait for its own preview to render.
+
+        A preview already on the page may belong to the previously selected file, and
+        the grid can reuse its elements, so first wait for the API response that loads
+        the clicked file; it names the file in its URL or request body.
+
+        Args:
+            page: Playwright page instance
+            file_name: File name shown in the tree
+            timeout: Maximum time to wait for each step in milliseconds
+        """
+
+        def loads_file(response: Response) -> bool:
+            request = response.request
+            return file_name in unquote(request.url) or file_name in (request.post_data or "")
+
+        with page.expect_response(loads_file, timeout=timeout):
+            LocatorUtils.tree_node(page, file_name).click()
+        LocatorUtils.wait_for_preview(page, timeout=timeout)
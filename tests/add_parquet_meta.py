@@ -1,26 +1,43 @@
 #!/usr/bin/env python3
 
+import io
 import os
 import shutil
 
+import click
 import pyarrow.parquet as pq
 
+# Magic bytes at the start and end of a parquet file with a plaintext footer
+PARQUET_MAGIC = b"PAR1"
+
+
+def sidecar_path(file_path):
+    """Path of the metadata-only sidecar written next to a parquet file."""
+    return file_path + ".metadata"
+
 
 def read_parquet_metadata(file_path):
-    """Read and print file-level metadata from a parquet file."""
+    """Read and print file-level metadata from a parquet file, preferring its sidecar."""
     try:
-        # Open the parquet file
-        parquet_file = pq.ParquetFile(file_path)
+        # A sidecar, when present, holds the edited metadata
+        metadata_file = sidecar_path(file_path)
+        if not os.path.exists(metadata_file):
+            metadata_file = file_path
+
+        # Read only the footer; no reader is set up for the row group data
+        metadata = pq.read_metadata(metadata_file, memory_map=True)
 
-        print(f"File: {file_path}")
+        print(f"File: {metadata_file}")
         print("=" * 80)
 
-        # Get file metadata
-        metadata = parquet_file.metadata
-        print(metadata)
+        # Print the file-level summary rather than per-column-chunk details
+        print(f"  created_by: {metadata.created_by}")
+        print(f"  num_columns: {metadata.num_columns}")
+        print(f"  num_rows: {metadata.num_rows}")
+        print(f"  num_row_groups: {metadata.num_row_groups}")
 
         # Also print schema metadata
-        schema = parquet_file.schema_arrow
+        schema = metadata.schema.to_arrow_schema()
         if schema.metadata:
             print("\nSchema metadata:")
             for key, value in schema.metadata.items():
@@ -32,7 +49,40 @@ def read_parquet_metadata(file_path):
         print(f"Error reading parquet file: {e}")
 
 
-def add_file_metadata(filepath, description, source, source_url, license_info):
+def splice_footer(filepath, temp_file, new_schema, metadata):
+    """
+    Write a copy of a parquet file with a new footer and its column chunk bytes untouched.
+
+    The row group metadata in the footer holds absolute offsets into the file, so
+    keeping every byte before the old footer keeps those offsets valid.
+
+    Args:
+        filepath (str): Path to the source parquet file
+        temp_file (str): Path to write the copy to
+        new_schema (pa.Schema): Arrow schema, with metadata, to store in the new footer
+        metadata (pq.FileMetaData): Footer metadata of the source file
+    """
+    # The file ends with the footer, its 4-byte little-endian length and the magic
+    file_size = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        f.seek(file_size - 8)
+        tail = f.read(8)
+    if tail[4:] != PARQUET_MAGIC:
+        raise ValueError(f"Unsupported parquet footer magic: {tail[4:]!r}")
+    data_end = file_size - 8 - int.from_bytes(tail[:4], "little")
+
+    # write_metadata emits a footer-only file: magic, footer, footer length, magic
+    footer = io.BytesIO()
+    pq.write_metadata(new_schema, footer, metadata_collector=[metadata])
+
+    shutil.copyfile(filepath, temp_file)
+    with open(temp_file, "r+b") as f:
+        f.truncate(data_end)
+        f.seek(data_end)
+        f.write(footer.getvalue()[len(PARQUET_MAGIC) :])
+
+
+def add_file_metadata(filepath, description, source, source_url, license_info, sidecar=False):
     """
     Add file-level metadata to a parquet file.
 
@@ -42,6 +92,8 @@ def add_file_metadata(filepath, description, source, source_url, license_info):
         source (str): Source of the data
         source_url (str): URL of the data source
         license_info (str): License information
+        sidecar (bool): Write the metadata to a `<filepath>.metadata` sidecar instead of
+            replacing the data file's footer. Only readers that look for the sidecar will see it.
     """
     try:
         if not filepath.endswith(".parquet"):
@@ -50,11 +102,12 @@ def add_file_metadata(filepath, description, source, source_url, license_info):
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"File not found: {filepath}")
 
-        # Read the existing parquet file
-        table = pq.read_table(filepath)
+        # Open the existing parquet file; only the footer is read, never the column data
+        parquet_file = pq.ParquetFile(filepath)
+        schema = parquet_file.schema_arrow
 
         # Get existing schema metadata
-        existing_metadata = table.schema.metadata or {}
+        existing_metadata = schema.metadata or {}
 
         # Create new metadata dictionary
         new_metadata = dict(existing_metadata)
@@ -64,17 +117,27 @@ def add_file_metadata(filepath, description, source, source_url, license_info):
         new_metadata[b"license"] = license_info.encode("utf-8")
 
         # Create new schema with updated metadata
-        new_schema = table.schema.with_metadata(new_metadata)
-
-        # Create new table with updated schema
-        new_table = table.cast(new_schema)
-
-        # Write to a temporary file first
-        temp_file = filepath.replace(".parquet", ".new.parquet")
-        pq.write_table(new_table, temp_file)
-
-        # Replace the original file
-        shutil.move(temp_file, filepath)
+        new_schema = schema.with_metadata(new_metadata)
+
+        if sidecar:
+            # Write only a footer: the new schema plus the existing row group
+            # metadata, pointing back at the unchanged data file
+            metadata = parquet_file.metadata
+            metadata.set_file_path(os.path.basename(filepath))
+            pq.write_metadata(new_schema, sidecar_path(filepath), metadata_collector=[metadata])
+        else:
+            # Write to a temporary file first: the original column chunks, byte for
+            # byte, followed by a new footer carrying the updated metadata
+            temp_file = filepath.replace(".parquet", ".new.parquet")
+            splice_footer(filepath, temp_file, new_schema, parquet_file.metadata)
+
+            # Replace the original file; the temp file is in the same directory, so
+            # this is a single atomic rename
+            os.replace(temp_file, filepath)
+
+            # A sidecar from an earlier edit would now shadow the new footer
+            if os.path.exists(sidecar_path(filepath)):
+                os.remove(sidecar_path(filepath))
 
         print(f"Successfully added metadata to {filepath}")
         print("Added metadata:")
@@ -87,20 +150,35 @@ def add_file_metadata(filepath, description, source, source_url, license_info):
         print(f"Error adding metadata to parquet file: {e}")
 
 
+@click.command()
+@click.argument("file_paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--description", required=True, help="Description of the dataset")
+@click.option("--source", required=True, help="Source of the data")
+@click.option("--source-url", required=True, help="URL of the data source")
+@click.option("--license", "license_info", required=True, help="License information")
+@click.option("--sidecar", is_flag=True, help="Write a .metadata sidecar instead of rewriting")
+def main(file_paths, description, source, source_url, license_info, sidecar):
+    """Add the same file-level metadata to one or more parquet files."""
+    for file_path in file_paths:
+        print("=== BEFORE ADDING METADATA ===")
+        read_parquet_metadata(file_path)
+
+        print("\n=== ADDING METADATA ===")
+        add_file_metadata(
+            filepath=file_path,
+            description=description,
+            source=source,
+            source_url=source_url,
+            license_info=license_info,
+            sidecar=sidecar,
+        )
+
+        print("\n=== AFTER ADDING METADATA ===")
+        read_parquet_metadata(file_path)
+
+
 if __name__ == "__main__":
-    file_path = "/Users/senlin/Work/COCO2017/organized/images-emb-2d.parquet"
-
-    print("=== BEFORE ADDING METADATA ===")
-    read_parquet_metadata(file_path)
-
-    print("\n=== ADDING METADATA ===")
-    add_file_metadata(
-        filepath=file_path,
-        description="COCO Object Detection dataset",
-        source="COCO",
-        source_url="https://cocodataset.org",
-        license_info="Creative Commons Attribution 4.0",
-    )
-
-    print("\n=== AFTER ADDING METADATA ===")
-    read_parquet_metadata(file_path)
+    # e.g. python tests/add_parquet_meta.py images-emb-2d.parquet \
+    #   --description "COCO Object Detection dataset" --source COCO \
+    #   --source-url https://cocodataset.org --license "Creative Commons Attribution 4.0"
+    main()
@@ -1,4 +1,5 @@
 import os
+import shutil
 import tempfile
 import unittest
 
@@ -9,19 +10,34 @@ from smoosense.handlers.fs import fs_bp
 
 logger = getLogger(__name__)
 
+# Keep per-test directories on tmpfs where available, so creating and removing them never hits disk
+TEMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
 
 class BaseFSTest(unittest.TestCase):
     """Base test class for file system handler tests."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Set up the Flask app once for all test methods of the class."""
+        cls.app = Flask(__name__)
+        cls.app.register_blueprint(fs_bp)
+        cls.app.config["TESTING"] = True
+        cls.client = cls.app.test_client()
+
+        # Set up application context for all tests
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Pop the application context after all test methods of the class."""
+        cls.app_context.pop()
+
     def setUp(self):
         """Set up test fixtures before each test method."""
-        self.app = Flask(__name__)
-        self.app.register_blueprint(fs_bp)
-        self.app.config["TESTING"] = True
-        self.client = self.app.test_client()
-
         # Create a temporary directory for testing
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = tempfile.mkdtemp(dir=TEMP_ROOT)
 
         # Create some test files and directories
         self.test_file = os.path.join(self.temp_dir, "test_file.txt")
@@ -37,14 +53,6 @@ class BaseFSTest(unittest.TestCase):
         with open(self.hidden_file, "w") as f:
             f.write("hidden content")
 
-        # Set up application context for all tests
-        self.app_context = self.app.app_context()
-        self.app_context.push()
-
     def tearDown(self):
         """Clean up after each test method."""
-        import shutil
-
-        # Pop the application context
-        self.app_context.pop()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
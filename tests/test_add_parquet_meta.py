@@ -0,0 +1,131 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from tests.add_parquet_meta import (
+    add_file_metadata,
+    read_parquet_metadata,
+    sidecar_path,
+)
+
+METADATA = {
+    "description": "Dummy dataset",
+    "source": "unit test",
+    "source_url": "https://example.com",
+    "license_info": "MIT",
+}
+
+
+class TestAddParquetMeta(unittest.TestCase):
+    """Test cases for the parquet metadata editing helpers"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "data.parquet")
+        self.table = pa.table(
+            {
+                "id": list(range(1000)),
+                "point": [{"x": i, "label": str(i % 3)} for i in range(1000)],
+                "tags": [[i, i + 1] for i in range(1000)],
+                "category": [f"cat_{i % 5}" for i in range(1000)],
+                "offset": list(range(0, 3000, 3)),
+            }
+        )
+        pq.write_table(
+            self.table,
+            self.file_path,
+            row_group_size=300,
+            compression={
+                "id": "zstd",
+                "point.x": "gzip",
+                "point.label": "none",
+                "tags.list.element": "brotli",
+                "category": "snappy",
+                "offset": "zstd",
+            },
+            compression_level={"offset": 19},
+            use_dictionary=["category"],
+            column_encoding={"offset": "DELTA_BINARY_PACKED"},
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def add_metadata(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            add_file_metadata(self.file_path, **METADATA, **kwargs)
+
+    def column_properties(self, file_path):
+        row_group = pq.read_metadata(file_path).row_group(0)
+        return {
+            row_group.column(j).path_in_schema: (
+                row_group.column(j).compression,
+                row_group.column(j).encodings,
+            )
+            for j in range(row_group.num_columns)
+        }
+
+    def data_bytes(self, file_path):
+        """Bytes of the file before its footer, i.e. the column chunks"""
+        with open(file_path, "rb") as f:
+            content = f.read()
+        return content[: len(content) - 8 - int.from_bytes(content[-8:-4], "little")]
+
+    def test_rewrite_preserves_codecs_and_dictionary(self):
+        """Test that a rewrite keeps the data, codecs, encodings and row groups"""
+        before = self.column_properties(self.file_path)
+        data_before = self.data_bytes(self.file_path)
+        self.add_metadata()
+
+        # Only the footer is replaced; the column chunks are the same bytes
+        self.assertEqual(self.data_bytes(self.file_path), data_before)
+
+        self.assertEqual(self.column_properties(self.file_path), before)
+        self.assertIn("DELTA_BINARY_PACKED", before["offset"][1])
+        self.assertIn("RLE_DICTIONARY", before["category"][1])
+        self.assertEqual(pq.read_metadata(self.file_path).num_row_groups, 4)
+        self.assertTrue(pq.read_table(self.file_path).equals(self.table))
+
+        schema_metadata = pq.read_schema(self.file_path).metadata
+        self.assertEqual(schema_metadata[b"description"], b"Dummy dataset")
+        self.assertEqual(schema_metadata[b"license"], b"MIT")
+
+    def test_sidecar_leaves_data_file_unchanged(self):
+        """Test that a sidecar write adds the keys without touching the data file"""
+        with open(self.file_path, "rb") as f:
+            data_before = f.read()
+
+        self.add_metadata(sidecar=True)
+
+        with open(self.file_path, "rb") as f:
+            self.assertEqual(f.read(), data_before)
+        self.assertTrue(os.path.exists(sidecar_path(self.file_path)))
+
+        sidecar_metadata = pq.read_metadata(sidecar_path(self.file_path))
+        self.assertEqual(sidecar_metadata.num_rows, 1000)
+        self.assertEqual(sidecar_metadata.row_group(0).column(0).file_path, "data.parquet")
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            read_parquet_metadata(self.file_path)
+        self.assertIn(f"File: {sidecar_path(self.file_path)}", output.getvalue())
+        self.assertIn("description: Dummy dataset", output.getvalue())
+        self.assertIn("source_url: https://example.com", output.getvalue())
+
+    def test_rewrite_removes_stale_sidecar(self):
+        """Test that a full rewrite deletes a sidecar that would shadow the new footer"""
+        self.add_metadata(sidecar=True)
+        self.add_metadata()
+
+        self.assertFalse(os.path.exists(sidecar_path(self.file_path)))
+        self.assertEqual(pq.read_schema(self.file_path).metadata[b"source"], b"unit test")
+
+
+if __name__ == "__main__":
+    unittest.main()